@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Config store - single home for VPC config persistence
+All managers read and write VPC configs through this module instead of
+each keeping its own copy of the load/save helpers
+"""
+
+import os
+from pathlib import Path
+from utils.config_io import (load_vpc_config, invalidate,
+                             save_json_atomic, subnet_index as _subnet_index)
+
+CONFIG_DIR = Path("/tmp/vpc_config")
+CONFIG_DIR.mkdir(exist_ok=True)
+
+
+def path_for(vpc_name):
+    """
+    Config file path for a VPC
+    """
+    return CONFIG_DIR/f"{vpc_name}.json"
+
+
+def get(vpc_name):
+    """
+    Load a VPC config, or None if the VPC does not exist
+    """
+    return load_vpc_config(path_for(vpc_name))
+
+
+def save(vpc_name, config):
+    """
+    Persist a VPC config atomically
+    """
+    save_json_atomic(path_for(vpc_name), config)
+
+
+def delete(vpc_name):
+    """
+    Remove a VPC config file and its cache entry
+    """
+    config_file = path_for(vpc_name)
+    config_file.unlink()
+    invalidate(config_file)
+
+
+def exists(vpc_name):
+    """
+    Check if a VPC config file exists
+    """
+    return path_for(vpc_name).exists()
+
+
+def subnet_index(vpc_name):
+    """
+    (by_cidr, by_name) subnet lookup dicts, or None if the VPC is missing
+    """
+    return _subnet_index(path_for(vpc_name))
+
+
+def list_names():
+    """
+    Names of all VPCs with a config on disk
+    """
+    with os.scandir(CONFIG_DIR) as entries:
+        return [entry.name[:-5] for entry in entries
+                if entry.name.endswith(".json")
+                and entry.is_file(follow_symlinks=False)]
@@ -1,82 +1,68 @@
 #!/usr/bin/env python3
 
 import logging
-import json
-from pathlib import Path
-from utils.network_utils import NetworkUtils
+from utils.network_utils import network_utils
+from utils.config_io import read_json
+from core import config_store
 
 
 class FirewallManager:
 
     def __init__(self):
-        self.network_utils = NetworkUtils()
+        self.network_utils = network_utils
         self.logger = logging.getLogger('vpcctl')
-        self.config_dir = Path("/tmp/vpc_config")
 
     def _get_vpc_config(self, vpc_name):
-        config_file = self.config_dir/f"{vpc_name}.json"
-        if config_file.exists():
-            with open(config_file) as f:
-                return json.load(f)
-        return None
+        return config_store.get(vpc_name)
 
     def apply_firewall_rules(self, vpc_name, rules_file):
         self.logger.info(
-            f"Applying firewall rules from {rules_file} to VPC {vpc_name}")
+            "Applying firewall rules from %s to VPC %s", rules_file, vpc_name)
 
         vpc_config = self._get_vpc_config(vpc_name)
         if not vpc_config:
-            self.logger.error(f"VPC {vpc_name} does not exist")
+            self.logger.error("VPC %s does not exist", vpc_name)
             return False
 
-        with open(rules_file) as f:
-            rules_config = json.load(f)
+        rules_config = read_json(rules_file)
 
         subnet_cidr = rules_config.get("subnet")
-        target_subnet = None
-
-        for subnet in vpc_config.get("subnets", []):
-            if subnet["cidr"] == subnet_cidr:
-                target_subnet = subnet
-                break
+        by_cidr, _ = config_store.subnet_index(vpc_name)
+        target_subnet = by_cidr.get(subnet_cidr)
 
         if not target_subnet:
             self.logger.error(
-                f"Subnet {subnet_cidr} not found in VPC {vpc_name}")
+                "Subnet %s not found in VPC %s", subnet_cidr, vpc_name)
             return False
 
         namespace = target_subnet["namespace"]
 
-        for rule in rules_config.get("ingress", []):
-            self.network_utils.apply_firewall_rule(namespace, rule)
+        self.network_utils.apply_firewall_rules_batch(
+            namespace, rules_config.get("ingress", []))
 
-        self.logger.info(f"Firewall rules applied to subnet {subnet_cidr}")
+        self.logger.info("Firewall rules applied to subnet %s", subnet_cidr)
         return True
 
     def apply_subnet_rules(self, vpc_name, subnet_name, rules):
         self.logger.info(
-            f"Applying firewall rules to subnet {subnet_name} in VPC {vpc_name}")
+            "Applying firewall rules to subnet %s in VPC %s", subnet_name, vpc_name)
 
         vpc_config = self._get_vpc_config(vpc_name)
         if not vpc_config:
-            self.logger.error(f"VPC {vpc_name} does not exist")
+            self.logger.error("VPC %s does not exist", vpc_name)
             return False
 
-        target_subnet = None
-        for subnet in vpc_config.get("subnets", []):
-            if subnet["name"] == subnet_name:
-                target_subnet = subnet
-                break
+        _, by_name = config_store.subnet_index(vpc_name)
+        target_subnet = by_name.get(subnet_name)
 
         if not target_subnet:
             self.logger.error(
-                f"Subnet {subnet_name} not found in VPC {vpc_name}")
+                "Subnet %s not found in VPC %s", subnet_name, vpc_name)
             return False
 
         namespace = target_subnet["namespace"]
 
-        for rule in rules:
-            self.network_utils.apply_firewall_rule(namespace, rule)
+        self.network_utils.apply_firewall_rules_batch(namespace, rules)
 
-        self.logger.info(f"Firewall rules applied to subnet {subnet_name}")
+        self.logger.info("Firewall rules applied to subnet %s", subnet_name)
         return True
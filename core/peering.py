@@ -1,37 +1,57 @@
 #!/usr/bin/env python3
 
 import logging
-import json
+import os
 from pathlib import Path
-from utils.network_utils import NetworkUtils
+from utils.network_utils import network_utils, IPTABLES_BIN
+from utils.config_io import read_json, save_json_atomic
+from core import config_store
 
 
 class PeeringManager:
 
     def __init__(self):
-        self.network_utils = NetworkUtils()
+        self.network_utils = network_utils
         self.logger = logging.getLogger('vpcctl')
-        self.config_dir = Path("/tmp/vpc_config")
         self.peering_dir = Path("/tmp/vpc_peering")
         self.peering_dir.mkdir(exist_ok=True)
+        self._peering_index = None
 
     def _get_vpc_config(self, vpc_name):
-        config_file = self.config_dir/f"{vpc_name}.json"
-        if config_file.exists():
-            with open(config_file) as f:
-                return json.load(f)
-        return None
+        return config_store.get(vpc_name)
+
+    def _get_peering_index(self):
+        """
+        Set of frozenset({vpc1, vpc2}) pairs with a peering on disk
+        Built from the stored configs - the filename can't be split
+        reliably once VPC names themselves contain hyphens - and kept
+        in sync on save/delete
+        """
+        if self._peering_index is None:
+            index = set()
+            with os.scandir(self.peering_dir) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        config = read_json(entry.path)
+                        index.add(
+                            frozenset((config["vpc1"], config["vpc2"])))
+                    except (OSError, ValueError, KeyError):
+                        self.logger.warning(
+                            "Skipping unreadable peering config %s",
+                            entry.name)
+            self._peering_index = index
+        return self._peering_index
 
     def _save_peering_config(self, peering_id, config):
-        config_file = self.peering_dir/f"{peering_id}.json"
-        with open(config_file, 'w') as f:
-            json.dump(config, fp=f, indent=2)
+        save_json_atomic(self.peering_dir/f"{peering_id}.json", config)
+        if self._peering_index is not None:
+            self._peering_index.add(
+                frozenset((config["vpc1"], config["vpc2"])))
 
     def _peering_exists(self, vpc1, vpc2):
-        peering_id1 = f"{vpc1}-{vpc2}"
-        peering_id2 = f"{vpc2}-{vpc1}"
-        return (self.peering_dir/f"{peering_id1}.json").exists() or \
-               (self.peering_dir/f"{peering_id2}.json").exists()
+        return frozenset((vpc1, vpc2)) in self._get_peering_index()
 
     def _remove_isolation_between_vpcs(self, bridge1, bridge2):
         """
@@ -39,15 +59,15 @@ class PeeringManager:
         """
         # Remove DROP rules in both directions
         self.network_utils.run_command(
-            f"iptables -D FORWARD -i {bridge1} -o {bridge2} -j DROP",
-            check=False
+            [IPTABLES_BIN, "-D", "FORWARD", "-i", bridge1, "-o", bridge2, "-j", "DROP"],
+            check=False, capture=False
         )
         self.network_utils.run_command(
-            f"iptables -D FORWARD -i {bridge2} -o {bridge1} -j DROP",
-            check=False
+            [IPTABLES_BIN, "-D", "FORWARD", "-i", bridge2, "-o", bridge1, "-j", "DROP"],
+            check=False, capture=False
         )
         self.logger.info(
-            f"Removed isolation rules between {bridge1} and {bridge2} for peering")
+            "Removed isolation rules between %s and %s for peering", bridge1, bridge2)
 
     def _add_isolation_between_vpcs(self, bridge1, bridge2):
         """
@@ -55,23 +75,23 @@ class PeeringManager:
         """
         # Add DROP rules in both directions
         self.network_utils.run_command(
-            f"iptables -I FORWARD -i {bridge1} -o {bridge2} -j DROP",
-            check=False
+            [IPTABLES_BIN, "-I", "FORWARD", "-i", bridge1, "-o", bridge2, "-j", "DROP"],
+            check=False, capture=False
         )
         self.network_utils.run_command(
-            f"iptables -I FORWARD -i {bridge2} -o {bridge1} -j DROP",
-            check=False
+            [IPTABLES_BIN, "-I", "FORWARD", "-i", bridge2, "-o", bridge1, "-j", "DROP"],
+            check=False, capture=False
         )
         self.logger.info(
-            f"Re-added isolation rules between {bridge1} and {bridge2}")
+            "Re-added isolation rules between %s and %s", bridge1, bridge2)
 
     def create_peering(self, vpc1_name, vpc2_name):
         self.logger.info(
-            f"Creating peering between {vpc1_name} and {vpc2_name}")
+            "Creating peering between %s and %s", vpc1_name, vpc2_name)
 
         if self._peering_exists(vpc1_name, vpc2_name):
             self.logger.warning(
-                f"Peering already exists between {vpc1_name} and {vpc2_name}")
+                "Peering already exists between %s and %s", vpc1_name, vpc2_name)
             return False
 
         vpc1_config = self._get_vpc_config(vpc1_name)
@@ -93,29 +113,23 @@ class PeeringManager:
         self.network_utils.attach_to_bridge(vpc1_config["bridge"], veth1)
         self.network_utils.attach_to_bridge(vpc2_config["bridge"], veth2)
 
-        for subnet in vpc2_config.get("subnets", []):
-            gateway_ip = vpc1_config.get("subnets", [{}])[0].get(
-                "gateway") if vpc1_config.get("subnets") else None
-            if gateway_ip:
-                try:
-                    self.network_utils.run_command(
-                        f"ip route add {subnet['cidr']} via {gateway_ip} dev {vpc1_config['bridge']}",
-                        check=False
-                    )
-                except:
-                    pass
-
-        for subnet in vpc1_config.get("subnets", []):
-            gateway_ip = vpc2_config.get("subnets", [{}])[0].get(
-                "gateway") if vpc2_config.get("subnets") else None
-            if gateway_ip:
-                try:
-                    self.network_utils.run_command(
-                        f"ip route add {subnet['cidr']} via {gateway_ip} dev {vpc2_config['bridge']}",
-                        check=False
-                    )
-                except:
-                    pass
+        # The gateways are loop-invariant (first subnet of each VPC), so
+        # compute them once and submit all routes in a single ip -batch
+        vpc1_subnets = vpc1_config.get("subnets", [])
+        vpc2_subnets = vpc2_config.get("subnets", [])
+        gateway1 = vpc1_subnets[0].get("gateway") if vpc1_subnets else None
+        gateway2 = vpc2_subnets[0].get("gateway") if vpc2_subnets else None
+
+        routes = []
+        if gateway1:
+            routes += [f"route add {s['cidr']} via {gateway1} dev {bridge1}"
+                       for s in vpc2_subnets]
+        if gateway2:
+            routes += [f"route add {s['cidr']} via {gateway2} dev {bridge2}"
+                       for s in vpc1_subnets]
+        # Dedupe while preserving order; force=True keeps going past
+        # routes that already exist (the old per-route check=False)
+        self.network_utils.ip_batch(list(dict.fromkeys(routes)), force=True)
 
         peering_id = f"{vpc1_name}-{vpc2_name}"
         peering_config = {
@@ -127,12 +141,12 @@ class PeeringManager:
 
         self._save_peering_config(peering_id, peering_config)
         self.logger.info(
-            f"Peering created between {vpc1_name} and {vpc2_name}")
+            "Peering created between %s and %s", vpc1_name, vpc2_name)
         return True
 
     def delete_peering(self, vpc1_name, vpc2_name):
         self.logger.info(
-            f"Deleting peering between {vpc1_name} and {vpc2_name}")
+            "Deleting peering between %s and %s", vpc1_name, vpc2_name)
 
         peering_id1 = f"{vpc1_name}-{vpc2_name}"
         peering_id2 = f"{vpc2_name}-{vpc1_name}"
@@ -158,6 +172,8 @@ class PeeringManager:
             self._add_isolation_between_vpcs(bridge1, bridge2)
 
         config_file.unlink()
+        if self._peering_index is not None:
+            self._peering_index.discard(frozenset((vpc1_name, vpc2_name)))
         self.logger.info(
-            f"Peering deleted between {vpc1_name} and {vpc2_name}")
+            "Peering deleted between %s and %s", vpc1_name, vpc2_name)
         return True
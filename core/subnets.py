@@ -1,73 +1,107 @@
 #!/usr/bin/env python3
 
+import hashlib
 import logging
-import json
 import ipaddress
-from pathlib import Path
-from utils.network_utils import NetworkUtils
+import subprocess
+from functools import lru_cache
+from utils.network_utils import network_utils, IP_BIN
+from utils.ns_pool import namespace_pool
+from core import config_store
+
+
+@lru_cache(maxsize=256)
+def _parse_net(cidr):
+    """
+    Cached CIDR parser - ipaddress.ip_network is pure Python and slow,
+    and repeated applies tend to hit the same CIDRs
+    """
+    return ipaddress.ip_network(cidr, strict=False)
 
 
 class SubnetManager:
 
     def __init__(self):
-        self.network_utils = NetworkUtils()
+        self.network_utils = network_utils
         self.logger = logging.getLogger('vpcctl')
-        self.config_dir = Path("/tmp/vpc_config")
 
     def _get_vpc_config(self, vpc_name):
-        config_file = self.config_dir/f"{vpc_name}.json"
-        if config_file.exists():
-            with open(config_file) as f:
-                return json.load(f)
-        return None
+        return config_store.get(vpc_name)
 
     def _save_vpc_config(self, vpc_name, config):
-        config_file = self.config_dir/f"{vpc_name}.json"
-        with open(config_file, 'w') as f:
-            json.dump(config, fp=f, indent=2)
+        config_store.save(vpc_name, config)
 
     def _get_gateway_ip(self, subnet_cidr):
-        network = ipaddress.ip_network(subnet_cidr)
-        return str(list(network.hosts())[0])
+        # First host = network address + 1, computed arithmetically
+        # instead of materializing every host in the subnet
+        return str(_parse_net(subnet_cidr).network_address + 1)
 
     def _get_subnet_ip(self, subnet_cidr):
-        network = ipaddress.ip_network(subnet_cidr)
-        return str(list(network.hosts())[1])
+        return str(_parse_net(subnet_cidr).network_address + 2)
 
     def create_subnet(self, vpc_name, subnet_name, subnet_cidr, subnet_type="private"):
         vpc_config = self._get_vpc_config(vpc_name)
         if not vpc_config:
-            self.logger.error(f"VPC {vpc_name} does not exist")
+            self.logger.error("VPC %s does not exist", vpc_name)
             return False
 
-        for subnet in vpc_config.get("subnets", []):
-            if subnet["name"] == subnet_name:
-                self.logger.warning(
-                    f"Subnet {subnet_name} already exists in VPC {vpc_name}")
-                return False
-
-        self.logger.info(f"Creating subnet {subnet_name} in VPC {vpc_name}")
-        namespace = f"ns-{vpc_name}-{subnet_name}"
+        _, by_name = config_store.subnet_index(vpc_name)
+        if subnet_name in by_name:
+            self.logger.warning(
+                "Subnet %s already exists in VPC %s", subnet_name, vpc_name)
+            return False
 
-        import hashlib
-        unique_id = hashlib.md5(
-            f"{vpc_name}-{subnet_name}".encode()).hexdigest()[:4]
+        self.logger.info("Creating subnet %s in VPC %s", subnet_name, vpc_name)
+        # Prefer a prewarmed namespace from the pool; it keeps its
+        # pool name (no netns rename in the kernel) and the subnet
+        # config records which namespace belongs to this subnet
+        namespace = namespace_pool.acquire()
+        pooled = namespace is not None
+        if not pooled:
+            namespace = f"ns-{vpc_name}-{subnet_name}"
+
+        unique_id = hashlib.blake2b(
+            f"{vpc_name}-{subnet_name}".encode(), digest_size=2).hexdigest()
         veth_ns = f"v{unique_id}n"
         veth_br = f"v{unique_id}b"
 
-        self.network_utils.create_network(namespace)
-        self.network_utils.create_veth_pair(veth_ns, veth_br)
-        self.network_utils.attach_to_bridge(vpc_config["bridge"], veth_br)
-        self.network_utils.move_to_namespace(veth_ns, namespace)
-
-        gateway_ip = self._get_gateway_ip(subnet_cidr)
-        subnet_ip = self._get_subnet_ip(subnet_cidr)
+        # Coalesce the namespace/veth/bridge plumbing into one
+        # 'ip -batch' process instead of ~6 separate ip invocations
+        bridge = vpc_config["bridge"]
+        batch = [] if pooled else [f"netns add {namespace}"]
+        batch += [
+            f"link add {veth_ns} type veth peer name {veth_br}",
+            f"link set {veth_ns} up",
+            f"link set {veth_br} up",
+            f"link set {veth_br} master {bridge}",
+            f"link set {veth_ns} netns {namespace}",
+        ]
+        try:
+            self.network_utils.ip_batch(batch)
+        except subprocess.CalledProcessError:
+            # Replay step by step - per-command errors are easier to
+            # diagnose and leftovers from a failed run get reused
+            self.logger.warning(
+                "ip batch failed for subnet %s, retrying step by step", subnet_name)
+            if not pooled:
+                self.network_utils.run_command(
+                    [IP_BIN, "netns", "add", namespace],
+                    check=False, capture=False)
+            self.network_utils.create_veth_pair(veth_ns, veth_br)
+            self.network_utils.attach_to_bridge(bridge, veth_br)
+            self.network_utils.move_to_namespace(veth_ns, namespace)
+
+        # Parse the CIDR once and derive everything from it
+        network = _parse_net(subnet_cidr)
+        prefix_len = network.prefixlen
+        gateway_ip = str(network.network_address + 1)
+        subnet_ip = str(network.network_address + 2)
 
         self.network_utils.set_ip_address(
-            namespace, veth_ns, f"{subnet_ip}/{subnet_cidr.split('/')[1]}")
+            namespace, veth_ns, f"{subnet_ip}/{prefix_len}")
 
         self.network_utils.set_bridge_ip(
-            vpc_config["bridge"], f"{gateway_ip}/{subnet_cidr.split('/')[1]}")
+            vpc_config["bridge"], f"{gateway_ip}/{prefix_len}")
 
         # IP forwarding is now handled at VPC level when NAT is enabled
         # self.network_utils.enable_ip_forwarding()  # REMOVE THIS LINE
@@ -88,5 +122,5 @@ class SubnetManager:
 
         vpc_config["subnets"].append(subnet_config)
         self._save_vpc_config(vpc_name, vpc_config)
-        self.logger.info(f"Subnet {subnet_name} created successfully")
+        self.logger.info("Subnet %s created successfully", subnet_name)
         return True
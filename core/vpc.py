@@ -4,11 +4,12 @@ VPC Manager - Handles VPC lifecycle (create, delete, manage)
 A VPC is like a virtual datacenter with its own network
 """
 
-import json
 import logging
-from datetime import datetime
-from pathlib import Path
-from utils.network_utils import NetworkUtils
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.network_utils import network_utils, IP_BIN
+from utils.ns_pool import namespace_pool
+from core import config_store
 
 
 class VPCManager:
@@ -17,73 +18,68 @@ class VPCManager:
     """
 
     def __init__(self):
-        self.network_utils = NetworkUtils()
-        self.config_dir = Path("/tmp/vpc_config")
+        self.network_utils = network_utils
         self.logger = logging.getLogger('vpcctl')
-        self.config_dir.mkdir(exist_ok=True)
+        self._vpcs_snapshot = None
 
     def _save_vpc_config(self, vpc_name, config):
         """
         Save VPC config to a json file
         """
-        config_file = self.config_dir/f"{vpc_name}.json"
-        with open(config_file, 'w') as f:
-            json.dump(config, fp=f, indent=2)
+        config_store.save(vpc_name, config)
 
     def _vpc_exists(self, vpc_name):
         """
         Check if a VPC already exists
         """
-        config_file = self.config_dir/f"{vpc_name}.json"
-        return config_file.exists()
+        return config_store.exists(vpc_name)
 
-    def _add_vpc_isolation_rules(self, bridge_name):
+    def _get_vpcs_snapshot(self):
+        """
+        Cached list_vpcs() result - avoids re-reading every config file
+        when several operations in one process need the VPC list
+        """
+        if self._vpcs_snapshot is None:
+            self._vpcs_snapshot = self.list_vpcs()
+        return self._vpcs_snapshot
+
+    def _add_vpc_isolation_rules(self, bridge_name, existing_vpcs):
         """
         Add iptables rules to isolate this VPC from other VPC bridges
         Block forwarding between different VPC bridges by default
         """
-        # Get list of existing VPC bridges to block traffic to/from them
-        existing_vpcs = self.list_vpcs()
-
+        # Collect both directions for every other VPC and commit them in
+        # a single iptables-restore transaction (one fork, one lock)
+        rules = []
         for vpc in existing_vpcs:
-            other_bridge = vpc.get("bridge", f"br-{vpc['name']}")
+            other_bridge = vpc["bridge"]
             if other_bridge != bridge_name:
-                # Block forwarding from this VPC to other VPCs
-                self.network_utils.run_command(
-                    f"iptables -I FORWARD -i {bridge_name} -o {other_bridge} -j DROP",
-                    check=False
-                )
-                # Block forwarding from other VPCs to this VPC
-                self.network_utils.run_command(
-                    f"iptables -I FORWARD -i {other_bridge} -o {bridge_name} -j DROP",
-                    check=False
-                )
+                rules.append(
+                    f"-I FORWARD -i {bridge_name} -o {other_bridge} -j DROP")
+                rules.append(
+                    f"-I FORWARD -i {other_bridge} -o {bridge_name} -j DROP")
                 self.logger.info(
-                    f"Added isolation rules between {bridge_name} and {other_bridge}")
+                    "Added isolation rules between %s and %s", bridge_name, other_bridge)
+        self.network_utils.apply_iptables_batch(rules)
 
-    def _remove_vpc_isolation_rules(self, bridge_name):
+    def _remove_vpc_isolation_rules(self, bridge_name, existing_vpcs):
         """
         Remove iptables isolation rules for this VPC
         """
         # Remove rules blocking this bridge from/to other VPC bridges
-        # We use -D to delete rules, with check=False to ignore if rule doesn't exist
-        existing_vpcs = self.list_vpcs()
-
+        # Some pairs may already be gone (peering deletes them), so
+        # use the best-effort delete rather than one transaction
+        rules = []
         for vpc in existing_vpcs:
-            other_bridge = vpc.get("bridge", f"br-{vpc['name']}")
+            other_bridge = vpc["bridge"]
             if other_bridge != bridge_name:
-                # Remove block from this VPC to other VPCs
-                self.network_utils.run_command(
-                    f"iptables -D FORWARD -i {bridge_name} -o {other_bridge} -j DROP",
-                    check=False
-                )
-                # Remove block from other VPCs to this VPC
-                self.network_utils.run_command(
-                    f"iptables -D FORWARD -i {other_bridge} -o {bridge_name} -j DROP",
-                    check=False
-                )
+                rules.append(
+                    f"-D FORWARD -i {bridge_name} -o {other_bridge} -j DROP")
+                rules.append(
+                    f"-D FORWARD -i {other_bridge} -o {bridge_name} -j DROP")
                 self.logger.debug(
-                    f"Removed isolation rules between {bridge_name} and {other_bridge}")
+                    "Removed isolation rules between %s and %s", bridge_name, other_bridge)
+        self.network_utils.delete_iptables_rules(rules)
 
     def create_vpc(self, vpc_name, cidr_block):
         """
@@ -92,9 +88,9 @@ class VPCManager:
         - cidr_block: The IP range for this datacenter (e.g. 10.0.0.0/16)
         - bridge: the main router that connects everything
         """
-        self.logger.info(f"Creating VPC: {vpc_name} with CIDR: {cidr_block}")
+        self.logger.info("Creating VPC: %s with CIDR: %s", vpc_name, cidr_block)
         if self._vpc_exists(vpc_name):
-            self.logger.warning(f"VPC {vpc_name} already exists")
+            self.logger.warning("VPC %s already exists", vpc_name)
             return False
 
         bridge_name = f"br-{vpc_name}"
@@ -103,44 +99,42 @@ class VPCManager:
         # Add isolation rules: block forwarding between this VPC and other VPCs
         # This ensures VPC isolation - traffic can only flow within the VPC
         # unless explicitly enabled via peering
-        self._add_vpc_isolation_rules(bridge_name)
+        self._add_vpc_isolation_rules(bridge_name, self._get_vpcs_snapshot())
 
         vpc_config = {
             "name": vpc_name,
             "cidr": cidr_block,
             "bridge": bridge_name,
             "subnets": [],
-            "created_at": datetime.now().isoformat()
+            "created_at_ns": time.time_ns()
         }
 
         self._save_vpc_config(vpc_name, vpc_config)
-        self.logger.info(f"VPC {vpc_name} created successfully")
+        self._vpcs_snapshot = None
+        self.logger.info("VPC %s created successfully", vpc_name)
         return True
 
     def _load_vpc_config(self, vpc_name):
         """
         Loads the VPC config from json file
         """
-        config_file = self.config_dir/f"{vpc_name}.json"
-        if config_file.exists():
-            with open(config_file) as f:
-                return json.load(f)
-        return None
+        return config_store.get(vpc_name)
 
     def delete_vpc(self, vpc_name):
         """
         Delete a VPC and cleanup all its resources
         """
-        self.logger.info(f"Deleting VPC: {vpc_name}")
+        self.logger.info("Deleting VPC: %s", vpc_name)
         if not self._vpc_exists(vpc_name):
-            self.logger.warning(f"VPC {vpc_name} does not exist")
+            self.logger.warning("VPC %s does not exist", vpc_name)
             return False
 
         vpc_config = self._load_vpc_config(vpc_name)
         bridge_name = vpc_config["bridge"]
 
         # Remove isolation rules for this VPC
-        self._remove_vpc_isolation_rules(bridge_name)
+        self._remove_vpc_isolation_rules(
+            bridge_name, self._get_vpcs_snapshot())
 
         if vpc_config.get("nat_enabled"):
             internet_iface = vpc_config.get("internet_interface")
@@ -149,27 +143,43 @@ class VPCManager:
                 self.network_utils.cleanup_nat_rules(
                     vpc_config["bridge"], internet_iface, public_subnet_cidrs)
 
-        for subnet in vpc_config["subnets"]:
-            subnet_name = subnet["name"]
-            namespace = f"ns-{vpc_name}-{subnet_name}"
-            self.network_utils.delete_network(namespace)
-
-        bridge_name = vpc_config["bridge"]
-        self.network_utils.delete_bridge(bridge_name)
+        # Namespace deletions are independent and mostly kernel wait
+        # time, so overlap them; the bridge teardown runs after in one
+        # forced ip -batch. Pooled namespaces go back to the pool
+        # instead of being destroyed
+        namespaces = [
+            subnet.get("namespace", f"ns-{vpc_name}-{subnet['name']}")
+            for subnet in vpc_config["subnets"]]
+        self.network_utils.run_commands_parallel(
+            [[IP_BIN, "netns", "del", ns] for ns in namespaces
+             if not ns.startswith("pool-")],
+            check=False
+        )
+        self.network_utils.ip_batch([
+            f"link set {bridge_name} down",
+            f"link del {bridge_name}",
+        ], force=True)
+        # release() deletes the links left inside each pooled
+        # namespace (bridge deletion only detaches ports, it doesn't
+        # remove the veth pairs) before returning it to the free list
+        for ns in namespaces:
+            namespace_pool.release(ns)
+        self.logger.info(
+            "Removed %s namespaces and bridge %s", len(vpc_config['subnets']), bridge_name)
 
-        config_file = self.config_dir/f"{vpc_name}.json"
-        config_file.unlink()
-        self.logger.info(f"VPC {vpc_name} deleted successfully")
+        config_store.delete(vpc_name)
+        self._vpcs_snapshot = None
+        self.logger.info("VPC %s deleted successfully", vpc_name)
         return True
 
     def enable_nat_gateway(self, vpc_name, internet_interface):
         """
         Enable NAT gateway for VPC to allow public subnet internet access
         """
-        self.logger.info(f"Enabling NAT gateway for VPC: {vpc_name}")
+        self.logger.info("Enabling NAT gateway for VPC: %s", vpc_name)
         vpc_config = self._load_vpc_config(vpc_name)
         if not vpc_config:
-            self.logger.error(f"VPC {vpc_name} does not exist")
+            self.logger.error("VPC %s does not exist", vpc_name)
             return False
 
         bridge_name = vpc_config["bridge"]
@@ -178,7 +188,7 @@ class VPCManager:
         public_subnets = [s for s in vpc_config.get(
             "subnets", []) if s.get("type") == "public"]
         if not public_subnets:
-            self.logger.warning(f"No public subnets found in VPC {vpc_name}")
+            self.logger.warning("No public subnets found in VPC %s", vpc_name)
             return False
 
         # Extract CIDRs of public subnets
@@ -188,14 +198,14 @@ class VPCManager:
         self.network_utils.setup_nat(
             bridge_name, internet_interface, public_subnet_cidrs)
         self.logger.info(
-            f"NAT enabled for public subnets: {', '.join(public_subnet_cidrs)}")
+            "NAT enabled for public subnets: %s", ', '.join(public_subnet_cidrs))
 
         vpc_config["nat_enabled"] = True
         vpc_config["internet_interface"] = internet_interface
         # Save for cleanup
         vpc_config["public_subnet_cidrs"] = public_subnet_cidrs
         self._save_vpc_config(vpc_name, vpc_config)
-        self.logger.info(f"NAT gateway enabled for VPC {vpc_name}")
+        self.logger.info("NAT gateway enabled for VPC %s", vpc_name)
         return True
 
     def list_vpcs(self):
@@ -203,15 +213,25 @@ class VPCManager:
         List all VPCs
         """
         vpcs = []
-        for config_file in self.config_dir.glob("*.json"):
-            with open(config_file) as f:
-                vpc_config = json.load(f)
-                vpcs.append({
-                    "name": vpc_config["name"],
-                    "cidr": vpc_config["cidr"],
-                    "subnets": len(vpc_config.get("subnets", [])),
-                    "nat_enabled": vpc_config.get("nat_enabled", False)
-                })
+        names = config_store.list_names()
+        if not names:
+            return vpcs
+
+        # Read the files concurrently - the GIL is released during IO,
+        # so wall time approaches the slowest read instead of the sum
+        with ThreadPoolExecutor(max_workers=min(32, len(names))) as executor:
+            configs = list(executor.map(config_store.get, names))
+
+        for vpc_config in configs:
+            if vpc_config is None:
+                continue
+            vpcs.append({
+                "name": vpc_config["name"],
+                "cidr": vpc_config["cidr"],
+                "bridge": vpc_config["bridge"],
+                "subnets": len(vpc_config.get("subnets", [])),
+                "nat_enabled": vpc_config.get("nat_enabled", False)
+            })
         return vpcs
 
     def get_vpc_details(self, vpc_name):
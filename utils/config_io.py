@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Config IO - shared helpers for reading VPC config JSON files
+Caches parsed configs in memory so repeated reads skip open/read/parse,
+and reads through mmap + orjson (when available) to cut parse overhead
+"""
+
+import json
+import mmap
+import os
+
+try:
+    import orjson
+except ImportError:
+    # orjson is optional - fall back to the stdlib parser
+    orjson = None
+
+
+# Maps config file path -> [st_mtime_ns, parsed config, subnet indexes]
+_VPC_CONFIG_CACHE = {}
+
+# Below this size mmap setup costs more than it saves
+_MMAP_THRESHOLD = 16 * 1024
+
+
+def read_json(path):
+    """
+    Parse a JSON file, mmap-ing large files to avoid an extra copy
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if size < _MMAP_THRESHOLD:
+            data = os.read(fd, size)
+            if orjson is not None:
+                return orjson.loads(data)
+            return json.loads(data)
+        with mmap.mmap(fd, size, prot=mmap.PROT_READ) as mm:
+            if orjson is not None:
+                return orjson.loads(memoryview(mm))
+            return json.loads(mm[:])
+    finally:
+        os.close(fd)
+
+
+def load_vpc_config(config_file):
+    """
+    Load a VPC config JSON file, reusing the cached copy when the
+    file has not changed on disk (mtime check) since the last read
+    Accepts a Path or a plain path string
+    """
+    path = os.fspath(config_file)
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    cached = _VPC_CONFIG_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns:
+        return cached[1]
+
+    config = read_json(path)
+    _VPC_CONFIG_CACHE[path] = [st.st_mtime_ns, config, None]
+    return config
+
+
+def subnet_index(config_file):
+    """
+    Return (by_cidr, by_name) lookup dicts for a VPC's subnets
+    Built once per cached config so repeated lookups are O(1)
+    """
+    path = os.fspath(config_file)
+    config = load_vpc_config(path)
+    if config is None:
+        return None
+    entry = _VPC_CONFIG_CACHE[path]
+    if entry[2] is None:
+        subnets = config.get("subnets", [])
+        entry[2] = ({s["cidr"]: s for s in subnets},
+                    {s["name"]: s for s in subnets})
+    return entry[2]
+
+
+def invalidate(config_file):
+    """
+    Drop the cached entry for a config file (call after writing it)
+    """
+    _VPC_CONFIG_CACHE.pop(os.fspath(config_file), None)
+
+
+def save_json_atomic(config_file, obj):
+    """
+    Serialize into one buffer and write via temp file + os.replace,
+    so a crash mid-write can never leave a torn config behind
+    """
+    path = os.fspath(config_file)
+    if orjson is not None:
+        data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    else:
+        data = json.dumps(obj, indent=2).encode()
+
+    tmp = f"{path}.tmp.{os.getpid()}"
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    invalidate(path)
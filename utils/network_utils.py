@@ -4,258 +4,689 @@ Network utilities - Low level linux networking interface
 This is where we run the ip, iptables and bridge commands
 """
 
+import asyncio
+import ctypes
+import os
+import re
+import shutil
 import subprocess
 import shlex
 import logging
+from functools import lru_cache
+
+# Resolve the binaries once at import - execvp scans PATH (a stat per
+# directory) on every spawn otherwise
+IP_BIN = shutil.which("ip") or "/sbin/ip"
+IPTABLES_BIN = shutil.which("iptables") or "/sbin/iptables"
+IPTABLES_RESTORE_BIN = shutil.which("iptables-restore") \
+    or "/sbin/iptables-restore"
+SYSCTL_BIN = shutil.which("sysctl") or "/sbin/sysctl"
+
+# Resolved once at import - getLogger takes the logging lock and
+# walks the manager dict on every call
+logger = logging.getLogger('vpcctl')
+
+CLONE_NEWNET = 0x40000000
+
+try:
+    _libc = ctypes.CDLL("libc.so.6", use_errno=True)
+except OSError:
+    # No glibc (non-Linux) - namespace entry falls back to ip netns exec
+    _libc = None
+
+
+def _enter_netns(ns_fd):
+    """
+    Join the network namespace behind ns_fd - runs in the child
+    between fork and exec (preexec_fn)
+    """
+    if _libc.setns(ns_fd, CLONE_NEWNET) != 0:
+        raise OSError(ctypes.get_errno(), "setns failed")
+
+
+# Rule-file actions -> iptables targets; unknown actions pass through
+# unchanged (e.g. a literal REJECT)
+_ACTION_MAP = {"ALLOW": "ACCEPT", "DENY": "DROP"}
+
+# Shell metacharacters (and nohup) that force a command through sh -c
+# - one compiled scan instead of nine substring searches per command
+_SHELL_META = re.compile(r"&&|\|\||[|&;<>`]|\$\(|nohup")
+
+# Input validators, compiled once - reject bad names/addresses with a
+# cheap match before paying fork+exec for the kernel to say the same
+# (and keep anything shell-unsafe out of the command stream entirely)
+_IFNAME_RE = re.compile(r"\A[A-Za-z0-9_.-]{1,15}\Z")     # IFNAMSIZ limit
+_NSNAME_RE = re.compile(r"\A[A-Za-z0-9_.-]+\Z")
+_IP_RE = re.compile(r"\A\d{1,3}(\.\d{1,3}){3}\Z")
+_CIDR_RE = re.compile(r"\A\d{1,3}(\.\d{1,3}){3}/\d{1,2}\Z")
+
+
+def _validate(pattern, value, what):
+    """
+    Raise ValueError when value doesn't match the expected shape
+    """
+    if not pattern.match(value):
+        raise ValueError(f"Invalid {what}: {value!r}")
+
+
+@lru_cache(maxsize=512)
+def _split_command(command):
+    """
+    Cached shlex.split - commands are rebuilt from a small set of
+    f-string templates, so repeats are common and the split is slow
+    """
+    return shlex.split(command)
 
 
 class NetworkUtils:
     """
     Handles all the direct linux networking commands
+
+    Every spawn here passes close_fds=False: the process holds no
+    sensitive descriptors beyond the pipes subprocess manages itself,
+    and skipping the close loop lets CPython use posix_spawn on the
+    paths without a preexec_fn (setns entry is the one exception -
+    preexec_fn forces the classic fork path there)
     """
 
     def __init__(self):
-        self.logger = logging.getLogger('vpcctl')
+        self._ip_queue = []
+        self._ns_shells = {}
 
-    def run_command(self, command, check=True):
+    def run_command(self, command, check=True, capture=True):
         """
-        Run a shell command and handle errors
+        Run a command and handle errors
+        Accepts a pre-split argv list (preferred, no tokenization) or
+        a command string. capture=False skips the stdout pipe for
+        fire-and-forget commands whose output nobody reads
         """
-        self.logger.debug(f"Running command: {command}")
+        logger.debug("Running command: %s", command)
+        if isinstance(command, str):
+            command = _split_command(command)
         try:
-            split_commands = shlex.split(command)
-            result = subprocess.run(
-                split_commands,
+            if capture:
+                result = subprocess.run(
+                    command,
+                    check=check,
+                    capture_output=True,
+                    text=True,
+                    close_fds=False
+                )
+                return result.stdout
+            subprocess.run(
+                command,
                 check=check,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+                close_fds=False
+            )
+            return None
+        except subprocess.CalledProcessError as e:
+            logger.error("Command failed: %s", command)
+            logger.error("Error: %s", e.stderr)
+            raise
+
+    async def run_command_async(self, argv, check=True):
+        """
+        Async variant of run_command for overlapping independent
+        subprocesses (iptables calls must stay serialized - they
+        contend on the xtables lock)
+        """
+        proc = await asyncio.create_subprocess_exec(
+            *argv,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if check and proc.returncode:
+            logger.error("Command failed: %s", argv)
+            logger.error("Error: %s", stderr.decode())
+            raise subprocess.CalledProcessError(
+                proc.returncode, argv, stdout, stderr)
+        return stdout.decode()
+
+    def run_commands_parallel(self, commands, check=True):
+        """
+        Run independent argv lists concurrently and return their
+        outputs in input order - wall time approaches the slowest
+        command instead of the sum
+        """
+        if not commands:
+            return []
+
+        async def _gather():
+            return await asyncio.gather(
+                *(self.run_command_async(argv, check=check)
+                  for argv in commands))
+        return asyncio.run(_gather())
+
+    def ip_batch(self, commands, force=False):
+        """
+        Run several ip commands through one 'ip -batch -' process
+        Each entry is an ip command line without the leading 'ip'
+        With force=True errors don't abort the rest of the batch
+        (the batch equivalent of check=False)
+        """
+        if not commands:
+            return
+        script = "\n".join(commands) + "\n"
+        logger.debug("Running ip batch:\n%s", script)
+        argv = [IP_BIN, "-force", "-batch", "-"] if force else [
+            IP_BIN, "-batch", "-"]
+        try:
+            subprocess.run(
+                argv,
+                input=script,
+                check=not force,
                 capture_output=True,
-                text=True
+                text=True,
+                close_fds=False
             )
-            return result.stdout
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"Command failed: {command}")
-            self.logger.error(f"Error: {e.stderr}")
+            logger.error("ip batch failed: %s", e.stderr)
             raise
 
+    def queue_ip(self, command):
+        """
+        Buffer an ip command (without the leading 'ip') so callers can
+        coalesce work across helpers into one flush_ip_batch()
+        """
+        self._ip_queue.append(command)
+
+    def flush_ip_batch(self, force=False):
+        """
+        Submit all queued ip commands through one 'ip -batch' process
+        """
+        queued, self._ip_queue = self._ip_queue, []
+        self.ip_batch(queued, force=force)
+
+    def run_iptables_restore(self, ruleset, check=False):
+        """
+        Pipe a full ruleset (one or more *table ... COMMIT blocks)
+        into a single iptables-restore --noflush process
+        Returns the exit status; failures are logged even when
+        check=False so they never vanish silently
+        """
+        logger.debug("Applying iptables ruleset:\n%s", ruleset)
+        result = subprocess.run(
+            [IPTABLES_RESTORE_BIN, "--noflush"],
+            input=ruleset,
+            capture_output=True,
+            text=True,
+            close_fds=False
+        )
+        if result.returncode:
+            if check:
+                logger.error("iptables-restore failed: %s", result.stderr)
+                raise subprocess.CalledProcessError(
+                    result.returncode, IPTABLES_RESTORE_BIN,
+                    result.stdout, result.stderr)
+            logger.warning("iptables-restore failed: %s", result.stderr)
+        return result.returncode
+
+    def apply_iptables_batch(self, rules, table="filter", check=False):
+        """
+        Apply multiple iptables rules in one iptables-restore transaction
+        Rules are lines like '-I FORWARD -i br-a -o br-b -j DROP'
+        """
+        if not rules:
+            return
+        ruleset = f"*{table}\n" + "\n".join(rules) + "\nCOMMIT\n"
+        self.run_iptables_restore(ruleset, check=check)
+
+    def delete_iptables_rules(self, rules, table="filter"):
+        """
+        Best-effort deletion of iptables rules ('-D ...' lines)
+        A restore transaction is all-or-nothing - one already-missing
+        rule aborts the whole block - so when the batched delete fails,
+        replay the rules one by one with per-rule tolerance (the old
+        fork-per-rule behaviour, paid only on the failure path)
+        """
+        if not rules:
+            return
+        ruleset = f"*{table}\n" + "\n".join(rules) + "\nCOMMIT\n"
+        if self.run_iptables_restore(ruleset) == 0:
+            return
+        logger.warning(
+            "Batched delete failed in table %s, replaying per rule", table)
+        for rule in rules:
+            self.run_command(
+                [IPTABLES_BIN, "-t", table] + rule.split(),
+                check=False, capture=False)
+
     def create_bridge(self, bridge_name):
         """
         Create a linux bridge - (Router Implementation)
         """
-        self.logger.info(f"Creating bridge: {bridge_name}")
-        self.run_command(f"ip link add {bridge_name} type bridge")
-        self.run_command(f"ip link set {bridge_name} up")
-        self.logger.info(f"Bridge {bridge_name} create and activated")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        logger.info("Creating bridge: %s", bridge_name)
+        self.ip_batch([
+            f"link add {bridge_name} type bridge",
+            f"link set {bridge_name} up",
+        ])
+        logger.info("Bridge %s create and activated", bridge_name)
 
     def delete_bridge(self, bridge_name):
         """
         Deletes a linux bridge
         """
-        self.logger.info(f"Deleting bridge: {bridge_name}")
-        self.run_command(f"ip link set {bridge_name} down", check=False)
-        self.run_command(f"ip link delete {bridge_name}", check=False)
-        self.logger.info(f"Bridge {bridge_name} deleted successfully")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        logger.info("Deleting bridge: %s", bridge_name)
+        self.ip_batch([
+            f"link set {bridge_name} down",
+            f"link delete {bridge_name}",
+        ], force=True)
+        logger.info("Bridge %s deleted successfully", bridge_name)
 
     def create_network(self, namespace):
         """
         Create a network namespace - (Subnet Implementation)
         """
-        self.logger.info(f"Creating network namespace: {namespace}")
-        self.run_command(f"ip netns add {namespace}")
-        self.logger.info(f"Created network namespace: {namespace}")
+        _validate(_NSNAME_RE, namespace, "namespace name")
+        logger.info("Creating network namespace: %s", namespace)
+        self.run_command([IP_BIN, "netns", "add", namespace], capture=False)
+        logger.info("Created network namespace: %s", namespace)
 
     def delete_network(self, namespace):
         """
         Delete a network namespace
         """
-        self.logger.info(f"Deleting network namespace: {namespace}")
-        self.run_command(f"ip netns delete {namespace}", check=False)
-        self.logger.info(f"Deleted network namespace: {namespace}")
+        _validate(_NSNAME_RE, namespace, "namespace name")
+        logger.info("Deleting network namespace: %s", namespace)
+        self.run_command([IP_BIN, "netns", "delete", namespace],
+                         check=False, capture=False)
+        logger.info("Deleted network namespace: %s", namespace)
 
-    def run_in_namespace(self, namespace, command, check=True):
+    def _get_ns_shell(self, namespace):
         """
-        Run a command inside a specific namespace
-        Commands with shell features (pipes, redirects, &&, etc.) need shell=True
+        Lazily start (and cache) a persistent /bin/sh inside the
+        namespace - repeated commands then cost one pipe round trip
+        instead of a fork+exec each. Returns None when the namespace
+        can't be entered (caller falls back to the one-shot path)
+        """
+        shell = self._ns_shells.get(namespace)
+        if shell is not None and shell.poll() is None:
+            return shell
+
+        if _libc is not None:
+            try:
+                ns_fd = os.open(f"/var/run/netns/{namespace}", os.O_RDONLY)
+            except OSError:
+                ns_fd = -1
+            if ns_fd >= 0:
+                try:
+                    shell = subprocess.Popen(
+                        ["/bin/sh"],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.STDOUT,
+                        text=True,
+                        bufsize=1,
+                        close_fds=False,
+                        preexec_fn=lambda: _enter_netns(ns_fd)
+                    )
+                except subprocess.SubprocessError:
+                    # setns refused the fd - try nsenter below
+                    shell = None
+                finally:
+                    os.close(ns_fd)
+                if shell is not None:
+                    self._ns_shells[namespace] = shell
+                    return shell
+
+        try:
+            shell = subprocess.Popen(
+                ["nsenter", f"--net=/var/run/netns/{namespace}", "/bin/sh"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                close_fds=False
+            )
+        except OSError:
+            return None
+        self._ns_shells[namespace] = shell
+        return shell
+
+    def _run_in_ns_shell(self, namespace, command, check):
+        """
+        Send a command to the namespace's persistent shell and read
+        its output up to the exit-status sentinel. Returns None when
+        the worker is unusable (caller falls back to the one-shot path)
+        """
+        shell = self._get_ns_shell(namespace)
+        if shell is None:
+            return None
+
+        sentinel = "__VPCCTL_DONE_"
+        try:
+            shell.stdin.write(f"{command}\necho {sentinel}$?__\n")
+            shell.stdin.flush()
+        except (OSError, ValueError):
+            self._ns_shells.pop(namespace, None)
+            return None
+
+        output_lines = []
+        returncode = None
+        for line in shell.stdout:
+            # Match the sentinel anywhere in the line - if the command's
+            # last output line has no trailing newline, the echo lands
+            # on the same line and a prefix match would block forever
+            idx = line.find(sentinel)
+            if idx >= 0:
+                returncode = int(line[idx + len(sentinel):]
+                                 .rstrip().rstrip('_'))
+                if idx:
+                    output_lines.append(line[:idx])
+                break
+            output_lines.append(line)
+        if returncode is None:
+            # The shell died before echoing the sentinel - drop it
+            self._ns_shells.pop(namespace, None)
+            return None
+
+        output = "".join(output_lines)
+        if check and returncode:
+            logger.error("Command failed: %s", command)
+            logger.error("Error: %s", output)
+            raise subprocess.CalledProcessError(
+                returncode, command, output=output, stderr=output)
+        return output
+
+    def close_all(self):
+        """
+        Tear down any cached per-namespace shell workers
+        """
+        shells, self._ns_shells = self._ns_shells, {}
+        for shell in shells.values():
+            if shell.poll() is not None:
+                continue
+            try:
+                shell.stdin.close()
+                shell.wait(timeout=2)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                shell.kill()
+
+    def run_in_namespace(self, namespace, command, check=True, input=None):
         """
-        self.logger.info(f"Running in network namespace: {namespace}")
+        Run a command inside a specific namespace
+        Simple commands go through a persistent per-namespace shell
+        worker (one pipe write instead of a fork+exec). Commands with
+        shell features (pipes, redirects, &&, etc.) spawn a one-shot
+        sh -c child that joins the namespace with setns(2) - running
+        those in the shared worker would let background jobs interleave
+        with later reads. Commands that read stdin (input=..., e.g.
+        'ip -batch -') also take the one-shot path
+        """
+        _validate(_NSNAME_RE, namespace, "namespace name")
+        logger.info("Running in network namespace: %s", namespace)
 
         # Check if command has shell features that require sh -c
-        shell_features = ['&&', '||', '|', '>',
-                          '<', '&', ';', 'nohup', '$(', '`']
-        needs_shell = any(feature in command for feature in shell_features)
+        needs_shell = bool(_SHELL_META.search(command))
+
+        if not needs_shell and input is None:
+            output = self._run_in_ns_shell(namespace, command, check)
+            if output is not None:
+                return output
+
+        argv = ['sh', '-c', command] if needs_shell \
+            else _split_command(command)
+
+        ns_fd = -1
+        if _libc is not None:
+            try:
+                ns_fd = os.open(f"/var/run/netns/{namespace}", os.O_RDONLY)
+            except OSError:
+                # Let ip netns exec produce the usual error reporting
+                ns_fd = -1
 
         try:
-            if needs_shell:
-                # For complex commands, use sh -c through ip netns exec
-                full_command = ['ip', 'netns', 'exec',
-                                namespace, 'sh', '-c', command]
+            if ns_fd >= 0:
                 result = subprocess.run(
-                    full_command,
+                    argv,
+                    input=input,
                     check=check,
                     capture_output=True,
-                    text=True
+                    text=True,
+                    close_fds=False,
+                    preexec_fn=lambda: _enter_netns(ns_fd)
                 )
-                return result.stdout
             else:
-                # For simple commands, use the regular method
-                full_command = f"ip netns exec {namespace} {command}"
-                return self.run_command(full_command, check=check)
+                result = subprocess.run(
+                    [IP_BIN, 'netns', 'exec', namespace] + argv,
+                    input=input,
+                    check=check,
+                    capture_output=True,
+                    text=True,
+                    close_fds=False
+                )
+            return result.stdout
         except subprocess.CalledProcessError as e:
-            self.logger.error(f"Command failed: {command}")
-            self.logger.error(f"Error: {e.stderr}")
+            logger.error("Command failed: %s", command)
+            logger.error("Error: %s", e.stderr)
             raise
+        finally:
+            if ns_fd >= 0:
+                os.close(ns_fd)
 
     def create_veth_pair(self, veth1, veth2):
         """
         Create a veth pair to connect namespaces
         """
-        self.logger.info(f"Creating veth pair: {veth1}, {veth2}")
+        _validate(_IFNAME_RE, veth1, "interface name")
+        _validate(_IFNAME_RE, veth2, "interface name")
+        logger.info("Creating veth pair: %s, %s", veth1, veth2)
 
-        # Check if veth pair already exists
-        try:
-            self.run_command(f"ip link show {veth1}", check=True)
-            self.logger.warning(
-                f"Veth pair {veth1} already exists, reusing it")
+        # Check if veth pair already exists - a sysfs stat instead of
+        # forking 'ip link show' just to test existence
+        if os.path.exists(f"/sys/class/net/{veth1}"):
+            logger.warning(
+                "Veth pair %s already exists, reusing it", veth1)
             # Make sure both ends are up
-            self.run_command(f"ip link set {veth1} up", check=False)
-            self.run_command(f"ip link set {veth2} up", check=False)
+            self.ip_batch([
+                f"link set {veth1} up",
+                f"link set {veth2} up",
+            ], force=True)
             return
-        except:
-            # Veth doesn't exist, create it
-            pass
 
-        self.run_command(f"ip link add {veth1} type veth peer name {veth2}")
-        self.run_command(f"ip link set {veth1} up")
-        self.run_command(f"ip link set {veth2} up")
-        self.logger.info(f"Created veth pair: {veth1}, {veth2}")
+        self.ip_batch([
+            f"link add {veth1} type veth peer name {veth2}",
+            f"link set {veth1} up",
+            f"link set {veth2} up",
+        ])
+        logger.info("Created veth pair: %s, %s", veth1, veth2)
 
     def attach_to_bridge(self, bridge_name, interface):
         """
         Attach an interface to a bridge
         """
-        self.logger.info(f"Attaching {interface} to bridge {bridge_name}")
-        self.run_command(f"ip link set {interface} master {bridge_name}")
+        _validate(_IFNAME_RE, interface, "interface name")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        logger.info("Attaching %s to bridge %s", interface, bridge_name)
+        self.run_command([IP_BIN, "link", "set", interface,
+                          "master", bridge_name], capture=False)
 
     def move_to_namespace(self, interface, namespace):
         """
         Move an interface to a network namespace
         """
-        self.logger.info(f"Moving {interface} to namespace {namespace}")
-        self.run_command(f"ip link set {interface} netns {namespace}")
+        _validate(_IFNAME_RE, interface, "interface name")
+        _validate(_NSNAME_RE, namespace, "namespace name")
+        logger.info("Moving %s to namespace %s", interface, namespace)
+        self.run_command([IP_BIN, "link", "set", interface,
+                          "netns", namespace], capture=False)
 
     def set_ip_address(self, namespace, interface, ip_address):
         """
         Set IP address on interface in namespace
         """
-        self.logger.info(
-            f"Setting IP {ip_address} on {interface} in {namespace}")
+        _validate(_IFNAME_RE, interface, "interface name")
+        _validate(_CIDR_RE, ip_address, "IP address")
+        logger.info(
+            "Setting IP %s on %s in %s", ip_address, interface, namespace)
+        # One namespace entry for both steps via ip -batch on stdin
         self.run_in_namespace(
-            namespace, f"ip addr add {ip_address} dev {interface}")
-        self.run_in_namespace(namespace, f"ip link set {interface} up")
+            namespace, "ip -batch -",
+            input=f"addr add {ip_address} dev {interface}\n"
+                  f"link set {interface} up\n")
 
     def set_bridge_ip(self, bridge_name, ip_address):
         """
         Set IP address on bridge
         Bridges can have multiple IPs (one per subnet), so we use 'ip addr add'
         """
-        self.logger.info(f"Setting IP {ip_address} on bridge {bridge_name}")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        _validate(_CIDR_RE, ip_address, "IP address")
+        logger.info("Setting IP %s on bridge %s", ip_address, bridge_name)
         # Use check=False to avoid errors if IP already exists
         self.run_command(
-            f"ip addr add {ip_address} dev {bridge_name}", check=False)
+            f"ip addr add {ip_address} dev {bridge_name}",
+            check=False, capture=False)
 
     def add_default_route(self, namespace, gateway_ip):
         """
         Add default route in namespace
         """
-        self.logger.info(
-            f"Adding default route via {gateway_ip} in {namespace}")
-        # First try to delete existing default route (if any)
-        self.run_in_namespace(
-            namespace, f"ip route del default", check=False)
+        _validate(_IP_RE, gateway_ip, "gateway IP")
+        logger.info(
+            "Adding default route via %s in %s", gateway_ip, namespace)
+        # 'replace' collapses the old delete-then-add pair into one
+        # command (and one namespace entry)
         self.run_in_namespace(
-            namespace, f"ip route add default via {gateway_ip}")
+            namespace, f"ip route replace default via {gateway_ip}")
 
     def enable_ip_forwarding(self):
         """
         Enable IP forwarding on host
         """
-        self.logger.info("Enabling IP forwarding")
-        self.run_command("sysctl -w net.ipv4.ip_forward=1")
+        logger.info("Enabling IP forwarding")
+        self.run_command([SYSCTL_BIN, "-w", "net.ipv4.ip_forward=1"],
+                         capture=False)
 
     def setup_nat(self, bridge_name, internet_interface, public_subnet_cidrs):
         """
         Setup NAT for outbound traffic from specific public subnets only
         Private subnets will not have internet access
         """
-        self.logger.info(
-            f"Setting up NAT for public subnets to {internet_interface}")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        _validate(_IFNAME_RE, internet_interface, "interface name")
+        for cidr in public_subnet_cidrs:
+            _validate(_CIDR_RE, cidr, "subnet CIDR")
+        logger.info(
+            "Setting up NAT for public subnets to %s", internet_interface)
         self.enable_ip_forwarding()
 
-        # Setup NAT rules for each public subnet CIDR
+        # Collect NAT and FORWARD rules for every public subnet CIDR
+        # and commit them in one iptables-restore transaction
+        nat_rules = []
+        filter_rules = []
         for cidr in public_subnet_cidrs:
-            self.logger.info(f"Setting up NAT for public subnet {cidr}")
+            logger.info("Setting up NAT for public subnet %s", cidr)
             # NAT only traffic from this specific public subnet
-            self.run_command(
-                f"iptables -t nat -A POSTROUTING -s {cidr} -o {internet_interface} -j MASQUERADE"
-            )
+            nat_rules.append(
+                f"-A POSTROUTING -s {cidr} -o {internet_interface} -j MASQUERADE")
             # Allow forwarding only from this specific public subnet
-            self.run_command(
-                f"iptables -A FORWARD -i {bridge_name} -s {cidr} -o {internet_interface} -j ACCEPT"
-            )
+            filter_rules.append(
+                f"-A FORWARD -i {bridge_name} -s {cidr} -o {internet_interface} -j ACCEPT")
 
         # Allow ALL return traffic from internet to bridge (for established connections)
         # This is safe because it only allows RELATED,ESTABLISHED traffic
-        self.run_command(
-            f"iptables -A FORWARD -i {internet_interface} -o {bridge_name} -m state --state RELATED,ESTABLISHED -j ACCEPT"
+        filter_rules.append(
+            f"-A FORWARD -i {internet_interface} -o {bridge_name} -m state --state RELATED,ESTABLISHED -j ACCEPT")
+
+        self.run_iptables_restore(
+            "*nat\n" + "\n".join(nat_rules) + "\nCOMMIT\n"
+            "*filter\n" + "\n".join(filter_rules) + "\nCOMMIT\n",
+            check=True
         )
 
     def add_route(self, namespace, destination, gateway):
         """
         Add a route in namespace
         """
-        self.logger.info(
-            f"Adding route to {destination} via {gateway} in {namespace}")
+        _validate(_CIDR_RE, destination, "destination CIDR")
+        _validate(_IP_RE, gateway, "gateway IP")
+        logger.info(
+            "Adding route to %s via %s in %s", destination, gateway, namespace)
         self.run_in_namespace(
             namespace, f"ip route add {destination} via {gateway}")
 
-    def apply_firewall_rule(self, namespace, rule):
+    def _format_firewall_rule(self, rule):
         """
-        Apply iptables firewall rule in namespace
+        Format a rule dict as an iptables INPUT rule line
         """
         protocol = rule.get('protocol', 'tcp')
         port = rule.get('port')
         action = rule.get('action', 'allow').upper()
-
-        if action == 'ALLOW':
-            target = 'ACCEPT'
-        elif action == 'DENY':
-            target = 'DROP'
-        else:
-            target = action
+        target = _ACTION_MAP.get(action, action)
 
         if port:
-            rule_cmd = f"iptables -A INPUT -p {protocol} --dport {port} -j {target}"
-        else:
-            rule_cmd = f"iptables -A INPUT -p {protocol} -j {target}"
+            return f"-A INPUT -p {protocol} --dport {port} -j {target}"
+        return f"-A INPUT -p {protocol} -j {target}"
 
-        self.logger.info(f"Applying firewall rule in {namespace}: {rule_cmd}")
+    def apply_firewall_rule(self, namespace, rule):
+        """
+        Apply iptables firewall rule in namespace
+        """
+        rule_cmd = f"iptables {self._format_firewall_rule(rule)}"
+        logger.info("Applying firewall rule in %s: %s", namespace, rule_cmd)
         self.run_in_namespace(namespace, rule_cmd)
 
+    def apply_firewall_rules_batch(self, namespace, rules):
+        """
+        Apply many firewall rules in one iptables-restore transaction
+        inside a namespace instead of forking iptables per rule
+        """
+        if not rules:
+            return
+        ruleset = "*filter\n" + "\n".join(
+            self._format_firewall_rule(rule) for rule in rules) + "\nCOMMIT\n"
+        logger.info(
+            "Applying %s firewall rules in %s", len(rules), namespace)
+        try:
+            subprocess.run(
+                [IP_BIN, "netns", "exec", namespace,
+                 IPTABLES_RESTORE_BIN, "--noflush"],
+                input=ruleset,
+                check=True,
+                capture_output=True,
+                text=True,
+                close_fds=False
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error(
+                "iptables-restore failed in %s: %s", namespace, e.stderr)
+            raise
+
     def cleanup_nat_rules(self, bridge_name, internet_interface, public_subnet_cidrs):
         """
         Cleanup NAT rules for public subnets
         """
-        self.logger.info(f"Cleaning up NAT rules for {bridge_name}")
+        _validate(_IFNAME_RE, bridge_name, "bridge name")
+        _validate(_IFNAME_RE, internet_interface, "interface name")
+        for cidr in public_subnet_cidrs:
+            _validate(_CIDR_RE, cidr, "subnet CIDR")
+        logger.info("Cleaning up NAT rules for %s", bridge_name)
 
-        # Clean up rules for each public subnet
+        # Delete the rules for every public subnet in two best-effort
+        # passes (one per table) - delete_iptables_rules falls back to
+        # per-rule replay when some rules are already gone
+        nat_rules = []
+        filter_rules = []
         for cidr in public_subnet_cidrs:
-            self.run_command(
-                f"iptables -t nat -D POSTROUTING -s {cidr} -o {internet_interface} -j MASQUERADE",
-                check=False
-            )
-            self.run_command(
-                f"iptables -D FORWARD -s {cidr} -i {bridge_name} -o {internet_interface} -j ACCEPT",
-                check=False
-            )
-            self.run_command(
-                f"iptables -D FORWARD -d {cidr} -i {internet_interface} -o {bridge_name} -m state --state RELATED,ESTABLISHED -j ACCEPT",
-                check=False
-            )
+            nat_rules.append(
+                f"-D POSTROUTING -s {cidr} -o {internet_interface} -j MASQUERADE")
+            filter_rules.append(
+                f"-D FORWARD -s {cidr} -i {bridge_name} -o {internet_interface} -j ACCEPT")
+            filter_rules.append(
+                f"-D FORWARD -d {cidr} -i {internet_interface} -o {bridge_name} -m state --state RELATED,ESTABLISHED -j ACCEPT")
+
+        self.delete_iptables_rules(nat_rules, table="nat")
+        self.delete_iptables_rules(filter_rules)
+
+
+# Shared instance - NetworkUtils keeps no per-call state, so the
+# managers can all reuse one object instead of constructing their own
+network_utils = NetworkUtils()
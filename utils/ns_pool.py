@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Namespace pool - pre-created network namespaces for subnet bring-up
+Creating a namespace costs real kernel setup time per 'ip netns add';
+prewarming a pool moves that cost to an explicit step so create-subnet
+can grab a ready namespace instead of paying it inline
+"""
+
+import logging
+import os
+import uuid
+from pathlib import Path
+from utils.config_io import read_json, save_json_atomic
+from utils.network_utils import network_utils, IP_BIN
+
+POOL_STATE = Path("/tmp/vpc_nspool.json")
+NETNS_DIR = "/var/run/netns"
+
+
+class NamespacePool:
+    """
+    Tracks free pre-created namespaces (named pool-<id>) in a small
+    state file shared across CLI invocations. The kernel offers no
+    netns rename, so an acquired namespace keeps its pool name - the
+    subnet config already records the namespace per subnet, which acts
+    as the logical-to-real mapping
+    """
+
+    def __init__(self):
+        self.network_utils = network_utils
+        self.logger = logging.getLogger('vpcctl')
+
+    def _load_free(self):
+        try:
+            state = read_json(POOL_STATE)
+        except (FileNotFoundError, ValueError):
+            return []
+        return state.get("free", [])
+
+    def _save_free(self, free):
+        save_json_atomic(POOL_STATE, {"free": free})
+
+    def prewarm(self, count):
+        """
+        Create count pooled namespaces concurrently and add them to
+        the free list
+        """
+        names = [f"pool-{uuid.uuid4().hex[:8]}" for _ in range(count)]
+        self.network_utils.run_commands_parallel(
+            [[IP_BIN, "netns", "add", name] for name in names])
+        self._save_free(self._load_free() + names)
+        self.logger.info("Prewarmed %s pooled namespaces", count)
+        return names
+
+    def acquire(self):
+        """
+        Pop a ready namespace from the pool, or None when it is empty
+        Entries whose namespace vanished out-of-band are skipped
+        """
+        free = self._load_free()
+        while free:
+            name = free.pop()
+            if os.path.exists(f"{NETNS_DIR}/{name}"):
+                self._save_free(free)
+                self.logger.info("Acquired pooled namespace %s", name)
+                return name
+            self._save_free(free)
+        return None
+
+    def release(self, namespace):
+        """
+        Strip and return a pooled namespace to the free list
+        Non-pool namespaces are left for the caller to delete
+        """
+        if not namespace.startswith("pool-"):
+            return False
+        # Deleting a bridge only detaches its ports - the subnet's
+        # veth survives VPC teardown with its address still configured.
+        # Delete every non-loopback link in here (which also removes
+        # the root-side peers) and flush routes so the next acquire()
+        # hands out a clean namespace
+        links = self.network_utils.run_command(
+            [IP_BIN, "-o", "-n", namespace, "link", "show"], check=False)
+        cleanup = []
+        for line in (links or "").splitlines():
+            fields = line.split(': ', 2)
+            if len(fields) < 2:
+                continue
+            dev = fields[1].split('@', 1)[0]
+            if dev != "lo":
+                cleanup.append(f"link del {dev}")
+        cleanup.append("route flush table main")
+        self.network_utils.run_in_namespace(
+            namespace, "ip -force -batch -", check=False,
+            input="\n".join(cleanup) + "\n")
+        free = self._load_free()
+        if namespace not in free:
+            free.append(namespace)
+            self._save_free(free)
+        self.logger.info("Released namespace %s back to pool", namespace)
+        return True
+
+
+# Shared instance, mirroring the network_utils singleton
+namespace_pool = NamespacePool()
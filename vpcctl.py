@@ -1,13 +1,11 @@
 #!/usr/bin/env python3
 
+# Managers are imported inside each command handler - every CLI run
+# dispatches to exactly one of them, and deferring the imports keeps
+# cold start (and --help) from loading the whole package
 import argparse
 import logging
 import sys
-from core.vpc import VPCManager
-from core.subnets import SubnetManager
-from core.peering import PeeringManager
-from core.firewall import FirewallManager
-from utils.network_utils import NetworkUtils
 
 
 def setup_logging(verbose=False):
@@ -20,6 +18,7 @@ def setup_logging(verbose=False):
 
 
 def create_vpc(args):
+    from core.vpc import VPCManager
     vpc_manager = VPCManager()
     if vpc_manager.create_vpc(args.name, args.cidr):
         print(
@@ -29,6 +28,7 @@ def create_vpc(args):
 
 
 def delete_vpc(args):
+    from core.vpc import VPCManager
     vpc_manager = VPCManager()
     if vpc_manager.delete_vpc(args.name):
         print(f"✓ VPC '{args.name}' deleted successfully")
@@ -37,6 +37,7 @@ def delete_vpc(args):
 
 
 def list_vpcs(args):
+    from core.vpc import VPCManager
     vpc_manager = VPCManager()
     vpcs = vpc_manager.list_vpcs()
     if vpcs:
@@ -52,6 +53,7 @@ def list_vpcs(args):
 
 
 def show_vpc(args):
+    from core.vpc import VPCManager
     vpc_manager = VPCManager()
     vpc = vpc_manager.get_vpc_details(args.name)
     if vpc:
@@ -69,6 +71,7 @@ def show_vpc(args):
 
 
 def add_subnet(args):
+    from core.subnets import SubnetManager
     subnet_manager = SubnetManager()
     if subnet_manager.create_subnet(args.vpc, args.name, args.cidr, args.type):
         print(f"✓ Subnet '{args.name}' added to VPC '{args.vpc}'")
@@ -77,6 +80,7 @@ def add_subnet(args):
 
 
 def enable_nat(args):
+    from core.vpc import VPCManager
     vpc_manager = VPCManager()
     if vpc_manager.enable_nat_gateway(args.vpc, args.interface):
         print(f"✓ NAT gateway enabled for VPC '{args.vpc}'")
@@ -85,6 +89,7 @@ def enable_nat(args):
 
 
 def create_peering(args):
+    from core.peering import PeeringManager
     peering_manager = PeeringManager()
     if peering_manager.create_peering(args.vpc1, args.vpc2):
         print(f"✓ Peering created between '{args.vpc1}' and '{args.vpc2}'")
@@ -93,6 +98,7 @@ def create_peering(args):
 
 
 def delete_peering(args):
+    from core.peering import PeeringManager
     peering_manager = PeeringManager()
     if peering_manager.delete_peering(args.vpc1, args.vpc2):
         print(f"✓ Peering deleted between '{args.vpc1}' and '{args.vpc2}'")
@@ -101,6 +107,7 @@ def delete_peering(args):
 
 
 def apply_firewall(args):
+    from core.firewall import FirewallManager
     firewall_manager = FirewallManager()
     if firewall_manager.apply_firewall_rules(args.vpc, args.rules):
         print(f"✓ Firewall rules applied to VPC '{args.vpc}'")
@@ -108,9 +115,24 @@ def apply_firewall(args):
     return 1
 
 
+def prewarm_namespaces(args):
+    from utils.ns_pool import namespace_pool
+    names = namespace_pool.prewarm(args.count)
+    print(f"✓ Prewarmed {len(names)} pooled namespaces")
+    return 0
+
+
 def exec_in_subnet(args):
-    network_utils = NetworkUtils()
+    from utils.network_utils import network_utils
+    from core import config_store
+    # Resolve the real namespace from the subnet config - pooled
+    # namespaces keep their pool name rather than ns-<vpc>-<subnet>
     namespace = f"ns-{args.vpc}-{args.subnet}"
+    index = config_store.subnet_index(args.vpc)
+    if index is not None:
+        subnet = index[1].get(args.subnet)
+        if subnet and subnet.get("namespace"):
+            namespace = subnet["namespace"]
     try:
         output = network_utils.run_in_namespace(namespace, args.command)
         print(output)
@@ -187,6 +209,13 @@ def main():
         'rules', help='Path to firewall rules JSON file')
     apply_firewall_parser.set_defaults(func=apply_firewall)
 
+    prewarm_parser = subparsers.add_parser(
+        'prewarm', help='Pre-create pooled namespaces for faster subnet creation')
+    prewarm_parser.add_argument(
+        'count', type=int, nargs='?', default=8,
+        help='Number of namespaces to prewarm (default: 8)')
+    prewarm_parser.set_defaults(func=prewarm_namespaces)
+
     exec_parser = subparsers.add_parser(
         'exec', help='Execute command in subnet namespace')
     exec_parser.add_argument('vpc', help='VPC name')
@@ -207,6 +236,12 @@ def main():
     except Exception as e:
         logging.error(f"Error: {e}", exc_info=args.verbose)
         return 1
+    finally:
+        # Tear down any persistent per-namespace shell workers, but
+        # only if something actually loaded the networking module
+        nu = sys.modules.get('utils.network_utils')
+        if nu is not None:
+            nu.network_utils.close_all()
 
 
 if __name__ == '__main__':